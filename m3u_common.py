@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+m3u_common.py
+
+Shared helpers for the update scripts:
+- parse_channels_file: reads the NAME : { ... } channel-group files
+- fetch_and_parse_source: streaming HTTP GET with on-disk conditional-GET
+  caching of both the body and the parsed blocks
+- parse_m3u_blocks: splits an M3U into header + (name, block) pairs
+- set_group_title_in_extinf: rewrites/injects group-title on an EXTINF line
+- transform_block: extracts cookie/UA and rewrites the URL to
+    base?cookie_part&xxx=%7Ccookie=cookie_part
+"""
+import functools
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import re
+import time
+from typing import Iterable, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CACHE_DIR = ".m3u_cache"
+
+# Hot patterns compiled once at import time
+_RE_COOKIE_JSON = re.compile(r'"cookie"\s*:\s*"([^"]+)"', re.IGNORECASE)
+_RE_UA_OPT = re.compile(r'http-user-agent=(.*)', re.IGNORECASE)
+
+# Shared session so all source fetches reuse pooled connections
+SESSION = requests.Session()
+# Ask for compressed transfer explicitly; playlists are very compressible
+# text, so this cuts most of the bytes on the wire
+SESSION.headers.update({
+    "User-Agent": "m3u-updater/1.0",
+    "Accept-Encoding": "gzip, deflate",
+})
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+
+def parse_channels_file(path: str) -> dict[str, list[str]]:
+    groups = {}
+    current_group = None
+    # read the file in one go: one syscall and one UTF-8 decode instead of
+    # per-line buffered iteration
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    for raw in text.splitlines():
+        if not raw or raw.isspace():
+            continue
+        line = raw.strip()
+        # group headers are 'NAME : {'; the grammar is fixed, so two string
+        # tests replace the regex match on every line
+        if line.endswith("{"):
+            name, sep, rest = line.partition(":")
+            if sep and name and rest.strip() == "{":
+                current_group = name.strip()
+                groups[current_group] = []
+                continue
+        if line == "}" and current_group:
+            current_group = None
+            continue
+        if current_group:
+            ch = line.rstrip(",").strip()
+            if ch:
+                groups[current_group].append(ch)
+    return groups
+
+
+# In-process cache so back-to-back fetches of the same URL (e.g. two scripts
+# run in one job) skip the network entirely for a few seconds
+_FETCH_TTL = 5.0
+_fetch_times = {}
+
+# bump when the parsed-blocks pickle layout changes so stale files self-invalidate
+_BLOCKS_PICKLE_VERSION = 1
+
+
+def _cache_paths(url: str) -> tuple[str, str, str]:
+    key = hashlib.sha1(url.encode()).hexdigest()
+    return (
+        os.path.join(CACHE_DIR, key + ".meta"),
+        os.path.join(CACHE_DIR, key + ".body"),
+        os.path.join(CACHE_DIR, key + ".blocks.pkl"),
+    )
+
+
+def _iter_cached_body(body_path: str) -> Iterator[str]:
+    with open(body_path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+def _stream_to_cache(r, body_path: str) -> Iterator[str]:
+    # tee each decoded line to the cache body file as it is yielded, so the
+    # full text never sits in memory and parsing overlaps the download; the
+    # tee goes to a tempfile that is only swapped in once the download ran to
+    # completion, so an aborted transfer can never leave a truncated body
+    # that older validators would revalidate as current
+    tmp = body_path + ".tmp"
+    with r, open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        for line in r.iter_lines(decode_unicode=True, chunk_size=65536):
+            f.write(line + "\n")
+            yield line
+    os.replace(tmp, body_path)
+
+
+def _load_meta(meta_path: str) -> dict:
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _load_parsed_blocks(blocks_path: str, meta: dict):
+    try:
+        with open(blocks_path, "rb") as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    if (cached.get("version") == _BLOCKS_PICKLE_VERSION
+            and cached.get("etag") == meta.get("etag")
+            and cached.get("last_modified") == meta.get("last_modified")):
+        return cached["header"], cached["blocks"]
+    return None
+
+
+def _store_parsed_blocks(blocks_path: str, meta: dict, header, blocks) -> None:
+    tmp = blocks_path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump({
+            "version": _BLOCKS_PICKLE_VERSION,
+            "etag": meta.get("etag"),
+            "last_modified": meta.get("last_modified"),
+            "header": header,
+            "blocks": blocks,
+        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, blocks_path)
+
+
+def fetch_and_parse_source(url: str) -> tuple[list[str], list[tuple[str, list[str]]]]:
+    """Fetch a source M3U and parse it into (header, blocks).
+
+    Sends a conditional GET using cached validators. On 304 (or within the
+    in-process TTL) the parsed blocks are reloaded from a pickle keyed by the
+    validators, skipping both the transfer and parse_m3u_blocks; otherwise the
+    download is streamed through the parser and both caches are refreshed.
+    """
+    meta_path, body_path, blocks_path = _cache_paths(url)
+    have_cache = os.path.exists(meta_path) and os.path.exists(body_path)
+    meta = _load_meta(meta_path) if have_cache else {}
+
+    fetched = _fetch_times.get(url)
+    if fetched is not None and time.monotonic() - fetched < _FETCH_TTL:
+        cached = _load_parsed_blocks(blocks_path, meta)
+        if cached is not None:
+            return cached
+        header, blocks = parse_m3u_blocks(_iter_cached_body(body_path))
+        _store_parsed_blocks(blocks_path, meta, header, blocks)
+        return header, blocks
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    r = SESSION.get(url, headers=headers, timeout=30, stream=True)
+    if r.status_code == 304:
+        r.close()
+        _fetch_times[url] = time.monotonic()
+        cached = _load_parsed_blocks(blocks_path, meta)
+        if cached is not None:
+            return cached
+        header, blocks = parse_m3u_blocks(_iter_cached_body(body_path))
+        _store_parsed_blocks(blocks_path, meta, header, blocks)
+        return header, blocks
+
+    r.raise_for_status()
+    # iter_lines(decode_unicode=True) yields bytes when the response carries
+    # no charset — the usual case for M3U content types like
+    # application/x-mpegurl — so pin an encoding before streaming; don't
+    # consult apparent_encoding, which buffers the entire body for charset
+    # detection and would defeat the streaming parse
+    if r.encoding is None:
+        r.encoding = "utf-8"
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    header, blocks = parse_m3u_blocks(_stream_to_cache(r, body_path))
+    meta = {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+    }
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+    _store_parsed_blocks(blocks_path, meta, header, blocks)
+    _fetch_times[url] = time.monotonic()
+    return header, blocks
+
+
+def parse_m3u_blocks(lines: Iterable[str]) -> tuple[list[str], list[tuple[str, list[str]]]]:
+    header = []
+    blocks = []
+    current_block = []
+    current_name = None
+    in_block = False
+    for line in lines:
+        # cheap first-char test keeps URL/blank lines off the startswith call
+        if line[:1] == "#" and line.startswith("#EXTINF"):
+            if in_block and current_block and current_name is not None:
+                blocks.append((current_name, current_block))
+            current_block = [line]
+            # display name after last comma; slicing avoids the prefix copy
+            # rpartition would make, and strip() tolerates "#EXTINF:-1, Name"
+            current_name = line[line.rfind(",") + 1:].strip()
+            in_block = True
+        elif in_block:
+            current_block.append(line)
+        else:
+            header.append(line)
+    if in_block and current_block and current_name is not None:
+        blocks.append((current_name, current_block))
+    return header, blocks
+
+
+_RE_BLOCK_SPLIT = re.compile(r'(?m)^(?=#EXTINF)')
+
+
+def parse_m3u_text(text: str) -> tuple[list[str], list[tuple[str, list[str]]]]:
+    """Parse a fully-materialized M3U string into (header, blocks).
+
+    One C-level regex split on block starts replaces the per-line dispatch of
+    parse_m3u_blocks — use this for the local playlist, which is read whole
+    anyway; remote sources stay on the streaming line parser.
+    """
+    parts = _RE_BLOCK_SPLIT.split(text)
+    header = parts[0].splitlines()
+    blocks = []
+    for part in parts[1:]:
+        lines = part.splitlines()
+        first = lines[0]
+        blocks.append((first[first.rfind(",") + 1:].strip(), lines))
+    return header, blocks
+
+
+def set_group_title_in_extinf(extinf_line: str, group: str) -> str:
+    # single scan over the line: locate the last comma, then splice the new
+    # group value in (or insert the attribute) without the regex engine
+    comma = extinf_line.rfind(",")
+    if comma < 0:
+        return extinf_line
+    attr = extinf_line.find('group-title="', 0, comma)
+    if attr >= 0:
+        value_start = attr + len('group-title="')
+        value_end = extinf_line.find('"', value_start)
+        if value_end < 0:
+            # unterminated attribute — leave the line untouched
+            return extinf_line
+        return extinf_line[:value_start] + group + extinf_line[value_end:]
+    return extinf_line[:comma] + f' group-title="{group}"' + extinf_line[comma:]
+
+
+def iter_output_lines(header: Iterable[str],
+                      blocks: Iterable[list[str]]) -> Iterator[str]:
+    """Iterate the final playlist lines: header first, then each block in order.
+
+    chain.from_iterable flattens the blocks at C speed — no generator frame
+    resumption per line the way a Python-level yield-from loop has.
+    """
+    return itertools.chain(header or ("#EXTM3U",),
+                           itertools.chain.from_iterable(blocks))
+
+
+def _file_sha1(path: str):
+    h = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.digest()
+
+
+def write_playlist(path: str, header: Iterable[str],
+                   blocks: Iterable[list[str]]) -> bool:
+    """Atomically write the playlist; returns False if it was already identical.
+
+    The content is streamed to a tempfile and swapped in with os.replace, so
+    readers never see a truncated file. When the output matches the existing
+    file byte-for-byte the swap is skipped entirely, leaving the mtime alone
+    so downstream sync/serve layers don't re-process an unchanged playlist.
+    """
+    tmp = path + ".tmp"
+    # stream line-by-line through a large buffer instead of joining the whole
+    # playlist into one string first; writing bytes skips the text-layer
+    # newline translation, and hashing each chunk as it goes out means the
+    # tempfile never has to be read back for the comparison
+    h = hashlib.sha1()
+    with open(tmp, "wb", buffering=1 << 20) as f:
+        for line in iter_output_lines(header, blocks):
+            data = (line + "\n").encode("utf-8")
+            h.update(data)
+            f.write(data)
+    if h.digest() == _file_sha1(path):
+        os.remove(tmp)
+        return False
+    os.replace(tmp, path)
+    return True
+
+
+def transform_block(src_block: list[str], preserve_exthttp: bool = False) -> list[str]:
+    """Memoizing front end for _transform_block.
+
+    The transform is a pure function of the block's lines (plus the
+    preserve_exthttp flag, which is part of the cache key), and on frequent
+    cron runs most source blocks are identical to the previous invocation —
+    so results are cached keyed on the (hashable) tuple of lines.
+    """
+    return list(_transform_block_cached(tuple(src_block), preserve_exthttp))
+
+
+@functools.lru_cache(maxsize=4096)
+def _transform_block_cached(src_lines: tuple[str, ...],
+                            preserve_exthttp: bool) -> tuple[str, ...]:
+    return tuple(_transform_block(list(src_lines), preserve_exthttp))
+
+
+def _merge_cookie_into_exthttp(exthttp_line: str, cookie: str | None) -> str:
+    """Return the original #EXTHTTP line, with the cookie merged in if absent.
+
+    Extra headers in the payload (Origin/Referer) are preserved untouched; a
+    line whose payload is not valid JSON is returned verbatim.
+    """
+    if not cookie:
+        return exthttp_line
+    prefix, _, payload = exthttp_line.partition(":")
+    try:
+        obj = json.loads(payload.strip())
+    except ValueError:
+        return exthttp_line
+    if not isinstance(obj, dict) or any(k.lower() == "cookie" for k in obj):
+        return exthttp_line
+    obj["cookie"] = cookie.strip()
+    return f"{prefix}:{json.dumps(obj, separators=(',', ':'))}"
+
+
+def _transform_block(src_block: list[str], preserve_exthttp: bool = False) -> list[str]:
+    """
+    - Find URL line (last non-# non-empty line)
+    - Extract cookie (from #EXTHTTP JSON or from URL |Cookie=... segment)
+    - Extract UA (from #EXTVLCOPT line or from URL &User-Agent=... segment)
+    - Remove existing #EXTVLCOPT and #EXTHTTP lines and the old URL
+    - Insert new #EXTVLCOPT and #EXTHTTP (if found)
+    - Append transformed URL (base?cookie_part&xxx=%7Ccookie=cookie_part) or original URL if nothing found
+    Returns new_block (list of lines).
+
+    With preserve_exthttp=True (the Zee variant), the original #EXTHTTP line
+    is kept as-is — its extra headers (Origin/Referer) matter — and a cookie
+    recovered elsewhere is merged into its JSON payload instead of replacing it.
+    """
+    if not src_block:
+        return src_block
+
+    # Single forward pass: drop old #EXTVLCOPT/#EXTHTTP lines (extracting
+    # cookie/UA as we go), remember the last non-# line as the URL, and keep
+    # everything else (including #KODIPROP and #EXTINF) in order
+    cookie_from_exthttp = None
+    ua_from_extvlc = None
+    original_exthttp = None
+    new_block = []
+    # bind the hot method once; skips the attribute lookup on every line
+    append = new_block.append
+    url_raw = None
+    url_line = None
+    url_pos = None
+    for ln in src_block:
+        if ln[:1] == "#":
+            if ln.startswith("#EXTHTTP"):
+                # the payload is JSON — parse it properly (json is a C
+                # extension and handles escapes/whitespace/extra fields the
+                # old regex silently missed); fall back to the regex on junk
+                if preserve_exthttp:
+                    original_exthttp = ln
+                payload = ln.partition(":")[2].strip()
+                try:
+                    obj = json.loads(payload)
+                except ValueError:
+                    obj = None
+                if isinstance(obj, dict):
+                    # key match is case-insensitive ("Cookie" shows up in
+                    # hand-written payloads), and only string values are
+                    # accepted — a payload like {"cookie": 123} parses fine
+                    # but must not reach the strip()/URL-rewrite code below
+                    cookie_val = next(
+                        (v for k, v in obj.items() if k.lower() == "cookie"), None)
+                    if isinstance(cookie_val, str) and cookie_val:
+                        cookie_from_exthttp = cookie_val
+                    # when the line is kept verbatim its user-agent must not
+                    # be duplicated into an #EXTVLCOPT as well
+                    ua_val = next(
+                        (v for k, v in obj.items() if k.lower() == "user-agent"), None)
+                    if (isinstance(ua_val, str) and ua_val
+                            and ua_from_extvlc is None and not preserve_exthttp):
+                        ua_from_extvlc = ua_val
+                else:
+                    m = _RE_COOKIE_JSON.search(ln)
+                    if m:
+                        cookie_from_exthttp = m.group(1)
+                continue
+            if ln.startswith("#EXTVLCOPT"):
+                # look for http-user-agent=
+                m = _RE_UA_OPT.search(ln)
+                if m:
+                    ua_from_extvlc = m.group(1).strip()
+                continue
+            append(ln)
+            continue
+        # lstrip returns the line itself when there is no leading whitespace,
+        # and the first-char compare replaces the startswith call; the rstrip
+        # is deferred until the line is actually a URL candidate
+        s = ln.lstrip()
+        if s and s[0] != "#":
+            # a later non-# line supersedes this candidate; restore the old one
+            if url_raw is not None:
+                new_block.insert(url_pos, url_raw)
+            url_raw = ln
+            url_line = s.rstrip()
+            url_pos = len(new_block)
+            continue
+        append(ln)
+
+    cookie_only = cookie_from_exthttp
+    ua = ua_from_extvlc
+    # both the cookie extraction and the base computation need the casefolded
+    # URL; lower it once instead of per use
+    url_lower = url_line.lower() if url_line else ""
+
+    # If cookie not found from #EXTHTTP, try parse from URL '|Cookie=' pattern
+    if cookie_only is None and url_line:
+        # case-insensitive check for '|cookie='; plain substring search is much
+        # cheaper than the regex engine for these fixed markers
+        pipe_idx = url_lower.find("|cookie=")
+        if pipe_idx >= 0:
+            tail = url_line[pipe_idx + len("|cookie="):].strip()
+            # split off User-Agent if present
+            ua_idx = tail.lower().find("&user-agent=")
+            if ua_idx >= 0:
+                cookie_only = tail[:ua_idx].strip()
+                ua = tail[ua_idx + len("&user-agent="):].strip()
+            else:
+                cookie_only = tail
+
+    # If still no cookie found, but URL already has ?__hdnea__ and &xxx=%7Ccookie=, try to extract cookie part
+    if cookie_only is None and url_line and "?__hdnea__=" in url_line:
+        marker_idx = url_line.find("&xxx=%7Ccookie=")
+        if marker_idx >= 0:
+            start = marker_idx + len("&xxx=%7Ccookie=")
+            end = url_line.find("&", start)
+            cand = url_line[start:] if end < 0 else url_line[start:end]
+            # value runs to the next '&' or whitespace, same as the old pattern
+            if cand and not cand[0].isspace():
+                cookie_only = cand.split(None, 1)[0]
+
+    # Clean block fast path: nothing to extract, no metadata lines were
+    # dropped (the length check catches those), and the URL is already the
+    # last line with no whitespace to trim — the rewrite would reproduce the
+    # input, so skip the reassembly
+    if (cookie_only is None and not ua and original_exthttp is None
+            and url_raw is not None and url_raw == url_line
+            and url_pos == len(new_block)
+            and len(new_block) == len(src_block) - 1):
+        return src_block
+
+    # Build transformed URL (only if we have base & cookie info)
+    transformed_url = url_line
+    if cookie_only and url_line:
+        # compute base: the left part before '|cookie=' if present, else before '?'
+        base_idx = url_lower.find("|cookie=")
+        if preserve_exthttp:
+            # the Zee variant drops the whole query string: cut at whichever
+            # of '?' / '|cookie=' comes first
+            q_idx = url_line.find("?")
+            if q_idx >= 0 and (base_idx < 0 or q_idx < base_idx):
+                base_idx = q_idx
+        if base_idx >= 0:
+            base = url_line[:base_idx].strip()
+        else:
+            # take up to first '?' as base
+            base = url_line.split("?", 1)[0].strip()
+        # Construct new URL in exact required format:
+        # base?cookie_only&xxx=%7Ccookie=cookie_only
+        transformed_url = f"{base}?{cookie_only}&xxx=%7Ccookie={cookie_only}"
+
+    # append #EXTVLCOPT if ua found
+    if ua:
+        ua_clean = ua.strip()
+        append(f'#EXTVLCOPT:http-user-agent={ua_clean}')
+
+    # append #EXTHTTP if cookie found; json.dumps escapes the value correctly
+    if original_exthttp is not None:
+        append(_merge_cookie_into_exthttp(original_exthttp, cookie_only))
+    elif cookie_only:
+        payload = json.dumps({"cookie": cookie_only.strip()}, separators=(",", ":"))
+        append(f'#EXTHTTP:{payload}')
+
+    # append transformed_url or fallback to original url
+    if transformed_url:
+        append(transformed_url)
+
+    return new_block
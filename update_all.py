@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+update_all.py
+
+Single driver for the Star + Sony update:
+- reads my_playlist.m3u once, applies both providers in-memory, writes once
+- fetches both sources in parallel over the shared pooled session
+- amortizes interpreter startup / requests import over both providers
+
+Usage:
+    python -m update_all                # both providers (default)
+    python -m update_all --star         # Star only
+    python -m update_all --sony         # Sony only
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from m3u_common import (
+    fetch_and_parse_source,
+    parse_channels_file,
+    parse_m3u_text,
+    set_group_title_in_extinf,
+    transform_block,
+    write_playlist,
+)
+
+MY_PLAYLIST = "my_playlist.m3u"
+CHANNELS_FILE = "channels.txt"
+SONY_CHANNELS_FILE = "sonychannels.txt"
+STAR_SOURCE_URL = "https://raw.githubusercontent.com/alex8875/m3u/refs/heads/main/jtv.m3u"
+SONY_SOURCE_URL = "https://solii.saqlainhaider8198.workers.dev/"
+
+
+class Provider(NamedTuple):
+    """One provider to apply: its channel-group file, source URL, and the
+    per-provider transform variant (Zee keeps its original #EXTHTTP line)."""
+    label: str
+    channels_file: str
+    source_url: str
+    preserve_exthttp: bool = False
+
+
+def _load_channel_map(path):
+    groups = parse_channels_file(path)
+    # mapping channel name (lower) -> group; interned so every later dict
+    # lookup on these names hits the pointer-equality fast path
+    return {sys.intern(ch.lower()): grp for grp, chs in groups.items() for ch in chs}
+
+
+def _apply_source(updated_blocks, channel_to_group, source_blocks, provider):
+    """Replace (or add) every channel of one provider in the playlist state."""
+    label = provider.label
+    # one C-level set intersection finds the channels this provider can serve;
+    # iteration still follows the channel file so additions stay deterministic
+    wanted = channel_to_group.keys() & source_blocks.keys()
+    for lname in channel_to_group:
+        if lname not in wanted:
+            continue
+        desired_group = channel_to_group[lname]
+        existing = updated_blocks.get(lname)
+        src_block = list(source_blocks[lname])
+        new_block = transform_block(src_block, preserve_exthttp=provider.preserve_exthttp)
+        new_block[0] = set_group_title_in_extinf(new_block[0], desired_group)
+        updated_blocks[lname] = new_block
+        # display names only matter for the log, so they are derived from the
+        # EXTINF line on demand rather than stored alongside every block
+        if existing is not None:
+            old_name = existing[0][existing[0].rfind(",") + 1:].strip()
+            print(f"[LOG] Replaced {label} channel with fresh block: {old_name}")
+        else:
+            display_name = new_block[0].rpartition(",")[2].strip()
+            print(f"[LOG] Added new {label} channel: {display_name}")
+
+
+def run_providers(providers):
+    """Apply any list of Providers: parse the playlist once, fetch all sources
+    in parallel, mutate a single in-memory state, write once."""
+    providers = list(providers)
+    if not providers:
+        return
+
+    channel_maps = {}
+    for p in providers:
+        print(f"[LOG] Reading {p.channels_file} ({p.label} channels)")
+        channel_maps[p.label] = _load_channel_map(p.channels_file)
+
+    # Fetch all sources in parallel — network-bound, so overlapping the
+    # round-trips cuts fetch time to the slowest of them; each worker streams
+    # its download straight into the parser
+    print(f"[LOG] Fetching {len(providers)} source M3U(s)…")
+    with ThreadPoolExecutor(max_workers=len(providers)) as ex:
+        futures = [ex.submit(fetch_and_parse_source, p.source_url) for p in providers]
+        parsed = [f.result() for f in futures]
+
+    source_blocks_by_label = {}
+    for p, (_, blocks_list) in zip(providers, parsed):
+        source_blocks_by_label[p.label] = {sys.intern(name.lower()): block for name, block in blocks_list}
+        print(f"[LOG] {p.label} source contains {len(source_blocks_by_label[p.label])} channels")
+
+    try:
+        with open(MY_PLAYLIST, "r", encoding="utf-8") as f:
+            my_text = f.read()
+        # the playlist is newline-terminated, so counting '\n' is the line count
+        line_count = my_text.count("\n")
+        print(f"[LOG] Loaded existing playlist with {line_count} lines")
+    except FileNotFoundError:
+        my_text = "#EXTM3U\n"
+        print("[LOG] No existing playlist, creating new")
+
+    header, my_blocks = parse_m3u_text(my_text)
+
+    # Single insertion-ordered dict keyed by lowercase name: gives O(1)
+    # membership/replacement and preserves playlist order for the final write;
+    # the value is the bare block — no per-row (name, block) tuple
+    updated_blocks = {sys.intern(name.lower()): block for name, block in my_blocks}
+
+    for p in providers:
+        print(f"[LOG] Processing {p.label} channels...")
+        _apply_source(updated_blocks, channel_maps[p.label], source_blocks_by_label[p.label], p)
+
+    # Reconstruct playlist
+    if not write_playlist(MY_PLAYLIST, header, updated_blocks.values()):
+        print("[LOG] No changes, playlist left untouched")
+    print(f"[LOG] ✅ Playlist updated, total {len(updated_blocks)} channels")
+    for p in providers:
+        channel_to_group = channel_maps[p.label]
+        source_blocks = source_blocks_by_label[p.label]
+        processed = sum(1 for ch in updated_blocks if ch in channel_to_group and ch in source_blocks)
+        print(f"[LOG] {p.label} channels processed: {processed}")
+
+
+def run(star=True, sony=True):
+    providers = []
+    if star:
+        providers.append(Provider("Star", CHANNELS_FILE, STAR_SOURCE_URL))
+    if sony:
+        providers.append(Provider("Sony", SONY_CHANNELS_FILE, SONY_SOURCE_URL))
+    run_providers(providers)
+
+
+def main():
+    args = sys.argv[1:]
+    if args:
+        run(star="--star" in args, sony="--sony" in args)
+    else:
+        run()
+
+
+if __name__ == "__main__":
+    main()